@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import time
+from urllib.parse import quote
+
+CITIES = ["London", "New York", "Tokyo", "Mumbai", "Sydney"]
+
+
+async def worker(host, port, paths, count, latencies, statuses):
+    """Send requests over a single keep-alive connection"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(count):
+            path = paths[i % len(paths)]
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b""):
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    paths = [f"/v1/current.json?q={quote(city)}" for city in args.cities]
+    # Spread the remainder so exactly args.requests requests are sent
+    per_worker, remainder = divmod(args.requests, args.concurrency)
+    latencies, statuses = [], {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(args.host, args.port, paths[i % len(paths):] + paths[:i % len(paths)],
+               per_worker + (1 if i < remainder else 0), latencies, statuses)
+        for i in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"Requests:    {len(latencies)} in {elapsed:.2f}s")
+    print(f"Throughput:  {len(latencies) / elapsed:.0f} req/s")
+    print(f"Latency p50: {latencies[len(latencies) // 2] * 1000:.2f} ms")
+    print(f"Latency p99: {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"Statuses:    {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a running weather gateway")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cities", nargs="+", default=CITIES)
+    args = parser.parse_args()
+    if args.requests < 1 or args.concurrency < 1:
+        parser.error("--requests and --concurrency must be positive")
+    # Idle workers would only open connections without sending anything
+    args.concurrency = min(args.concurrency, args.requests)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from .weather_sdk import WeatherSDK
 from .models import WeatherResponse, Forecast, Location, CurrentWeather, ForecastDay
+from .history import HistoryStore
+from .transport import RecordingTransport, ReplayTransport
+from .gateway import WeatherGateway
 from .exceptions import WeatherSDKException, InvalidAPIKeyError, CityNotFoundError, RateLimitError, APIError
 
 __all__ = [
@@ -9,6 +12,10 @@ __all__ = [
     'Location',
     'CurrentWeather',
     'ForecastDay',
+    'HistoryStore',
+    'RecordingTransport',
+    'ReplayTransport',
+    'WeatherGateway',
     'WeatherSDKException',
     'InvalidAPIKeyError',
     'CityNotFoundError',
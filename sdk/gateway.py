@@ -0,0 +1,293 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+import requests.adapters
+from dotenv import load_dotenv
+
+from .exceptions import InvalidAPIKeyError
+from .transport import ReplayTransport, request_key
+
+ENDPOINTS = ("current.json", "forecast.json")
+
+# (status, content type, body)
+CachedResponse = Tuple[int, str, bytes]
+
+
+class _TokenBucket:
+    """Async token bucket shared by every upstream request"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+
+class WeatherGateway:
+    """
+    Local HTTP gateway that mirrors the current.json and forecast.json endpoints.
+
+    Responses are served from a shared in-memory cache. Concurrent misses for
+    the same request are coalesced into a single upstream call, and all
+    upstream calls go through a global rate limiter. Clients point their
+    WeatherSDK at the gateway through base_url; any API key they send is
+    ignored and replaced by the gateway's own.
+
+    Args:
+        api_key (str, optional): API key for WeatherAPI.com. If not provided, will look for WEATHER_API_KEY env var
+        upstream_url (str, optional): Base URL of the upstream API
+        transport (optional): Object with a requests-style get() used for upstream calls. Defaults to a requests.Session
+        cache_ttl (float, optional): Seconds successful responses are cached for. Defaults to 300
+        max_entries (int, optional): Maximum number of cached responses. Defaults to 10000
+        rate_limit (float, optional): Maximum upstream requests per second, or None for no limit. Defaults to 10
+        burst (int, optional): Upstream requests allowed back to back before rate limiting. Defaults to rate_limit
+        timeout (float, optional): Seconds to wait for an upstream response before answering 504. Defaults to 10
+        max_workers (int, optional): Threads available for concurrent upstream calls. Defaults to 32
+
+    Raises:
+        InvalidAPIKeyError: If no API key is available and no transport is given
+    """
+
+    def __init__(self, api_key: Optional[str] = None,
+                 upstream_url: str = "https://api.weatherapi.com/v1",
+                 transport=None, cache_ttl: float = 300.0, max_entries: int = 10000,
+                 rate_limit: Optional[float] = 10.0, burst: Optional[int] = None,
+                 timeout: float = 10.0, max_workers: int = 32):
+        load_dotenv()
+        self.api_key = api_key or os.getenv("WEATHER_API_KEY")
+        if transport is None and not self.api_key:
+            raise InvalidAPIKeyError("No API key provided")
+        self.upstream_url = upstream_url.rstrip("/")
+        if transport is None:
+            # Size the pool to the executor so concurrent misses reuse connections
+            transport = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            transport.mount("https://", adapter)
+            transport.mount("http://", adapter)
+        self.transport = transport
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1, int(rate_limit or 1))
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="weather-gateway")
+        self.stats = {"requests": 0, "hits": 0, "upstream": 0}
+        self._cache: Dict[str, Tuple[float, CachedResponse]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._limiter: Optional[_TokenBucket] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    def _fetch_upstream(self, endpoint: str, params: dict) -> CachedResponse:
+        """Blocking upstream call, run in the gateway's executor"""
+        params = dict(params)
+        params["key"] = self.api_key
+        headers = {
+            "User-Agent": "WeatherSDK-Gateway/2.0",
+            "Accept": "application/json"
+        }
+        try:
+            response = self.transport.get(f"{self.upstream_url}/{endpoint}",
+                                          params=params, headers=headers,
+                                          timeout=self.timeout)
+        except requests.exceptions.Timeout:
+            return _error(504, "Upstream request timed out")
+        except Exception as e:
+            return _error(502, f"Upstream request failed: {e}")
+        content_type = response.headers.get("Content-Type", "application/json")
+        return response.status_code, content_type, response.text.encode("utf-8")
+
+    async def _upstream(self, key: str, endpoint: str, params: dict) -> CachedResponse:
+        if self._limiter is not None:
+            await self._limiter.acquire()
+        self.stats["upstream"] += 1
+        loop = asyncio.get_running_loop()
+        call = loop.run_in_executor(self._executor, self._fetch_upstream, endpoint, params)
+        try:
+            # The transport timeout only bounds each socket operation, so
+            # also bound the total wait for clients sharing this call
+            result = await asyncio.wait_for(call, self.timeout * 2)
+        except asyncio.TimeoutError:
+            return _error(504, "Upstream request timed out")
+        if result[0] == 200 and self.cache_ttl > 0:
+            if len(self._cache) >= self.max_entries:
+                # Dicts keep insertion order, so this drops the oldest entry
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+        return result
+
+    async def get(self, endpoint: str, params: dict) -> Tuple[CachedResponse, bool]:
+        """
+        Get a response for an endpoint, from the cache when possible
+
+        Returns:
+            Tuple[CachedResponse, bool]: The response and whether it was a cache hit
+        """
+        self.stats["requests"] += 1
+        key = request_key(endpoint, params)
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self.stats["hits"] += 1
+                return cached[1], True
+            del self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._upstream(key, endpoint, params))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future), False
+
+    async def _handle(self, request_line: bytes) -> Tuple[CachedResponse, Optional[bool]]:
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            return _error(400, "Malformed request line"), None
+        if method != "GET":
+            return _error(405, "Only GET is supported"), None
+
+        url = urlsplit(target)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        if endpoint not in ENDPOINTS:
+            return _error(404, f"Unknown endpoint: {url.path}"), None
+        params = {name: value for name, value in parse_qsl(url.query) if name != "key"}
+        if not params.get("q"):
+            return _error(400, "Parameter q is missing."), None
+        return await self.get(endpoint, params)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request_line, keep_alive = await self._read_request(reader)
+                except ValueError:
+                    # Request line or header longer than the reader's limit
+                    error = _error(431, "Request line or header too large")
+                    await self._write_response(writer, error, None, False)
+                    break
+                if request_line is None:
+                    break
+                response, hit = await self._handle(request_line)
+                await self._write_response(writer, response, hit, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[Optional[bytes], bool]:
+        """Read a request line and its headers, returning None at end of stream"""
+        request_line = (await reader.readline()).rstrip(b"\r\n")
+        if not request_line:
+            return None, False
+        keep_alive = not request_line.endswith(b"HTTP/1.0")
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            if name.strip().lower() == "connection":
+                keep_alive = value.strip().lower() == "keep-alive"
+        return request_line, keep_alive
+
+    async def _write_response(self, writer: asyncio.StreamWriter, response: CachedResponse,
+                              hit: Optional[bool], keep_alive: bool) -> None:
+        status, content_type, body = response
+        head = [
+            f"HTTP/1.1 {status} {_reason(status)}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if hit is not None:
+            head.append(f"X-Cache: {'HIT' if hit else 'MISS'}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """Start listening; use port 0 to pick a free port"""
+        if self.rate_limit:
+            self._limiter = _TokenBucket(self.rate_limit, self.burst)
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise outlive the server
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        await self.start(host, port)
+        async with self._server:
+            await self._server.serve_forever()
+
+
+def _reason(status: int) -> str:
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return "Unknown"
+
+
+def _error(status: int, message: str) -> CachedResponse:
+    body = json.dumps({"error": {"message": message}}).encode("utf-8")
+    return status, "application/json", body
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Local caching gateway for WeatherAPI.com")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ttl", type=float, default=300.0, help="Cache TTL in seconds")
+    parser.add_argument("--rate-limit", type=float, default=10.0,
+                        help="Upstream requests per second, 0 to disable")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Upstream timeout in seconds")
+    parser.add_argument("--workers", type=int, default=32, help="Threads for concurrent upstream calls")
+    parser.add_argument("--replay", help="Serve a recording made with RecordingTransport instead of the live API")
+    args = parser.parse_args(argv)
+
+    transport = ReplayTransport(args.replay) if args.replay else None
+    gateway = WeatherGateway(transport=transport, cache_ttl=args.ttl,
+                             rate_limit=args.rate_limit or None, timeout=args.timeout,
+                             max_workers=args.workers)
+    print(f"Weather gateway listening on http://{args.host}:{args.port}/v1")
+    try:
+        asyncio.run(gateway.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
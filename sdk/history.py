@@ -0,0 +1,282 @@
+import mmap
+import os
+import re
+import struct
+import time
+from array import array
+from contextlib import contextmanager
+from typing import List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .models import Forecast, WeatherResponse
+
+# Columns recorded for every observation, all stored as float64 so raw
+# observations and aggregates report exactly the same values.
+FIELDS = ("temp_c", "humidity", "wind_kph")
+TIMESTAMP_COLUMN = "ts"
+_COLUMNS = (TIMESTAMP_COLUMN,) + FIELDS
+_TYPECODE = "d"
+
+RESOLUTIONS = {
+    "hour": 3600,
+    "day": 86400,
+}
+
+# One aggregate row per bucket: bucket start, count, then sum/min/max per field
+_AGGREGATE_ROW = struct.Struct("<qq" + "ddd" * len(FIELDS))
+
+
+def location_key(location) -> str:
+    """Build a filesystem-safe key for a location"""
+    raw = f"{location.name}-{location.region}-{location.country}".lower()
+    return re.sub(r"[^a-z0-9]+", "_", raw).strip("_") or "unknown"
+
+
+@contextmanager
+def _locked(path: str, shared: bool = False):
+    """
+    Hold an advisory lock on a lock file for the duration of the block.
+
+    Shared locks open an existing lock file read-only, so readers never
+    need write access to the store.
+    """
+    with open(path, "rb" if shared else "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _merge(row: Optional[tuple], bucket: int, values: List[float]) -> tuple:
+    """Fold one observation into an aggregate row, creating it if needed"""
+    if row is None:
+        merged = [bucket, 1]
+        for value in values:
+            merged += [value, value, value]
+        return tuple(merged)
+    merged = [bucket, row[1] + 1]
+    for i, value in enumerate(values):
+        total, minimum, maximum = row[2 + 3 * i:5 + 3 * i]
+        merged += [total + value, min(minimum, value), max(maximum, value)]
+    return tuple(merged)
+
+
+def _read_mapped(path: str) -> bytes:
+    """Read a whole file through a memory-mapped view"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return b""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+
+
+class HistoryStore:
+    """
+    Append-only local time-series store for current weather observations.
+
+    Each location gets its own directory holding one binary file per column
+    (timestamps plus every entry in FIELDS). Rows are only ever appended and
+    are read back through memory-mapped views. Hourly and daily
+    min/max/mean aggregates live in fixed-width binary rows, one file per
+    resolution; each append rewrites only the row of the bucket it falls in.
+    Writes and reads take a per-location file lock, so several processes can
+    share a store and the aggregates always match the raw columns.
+
+    Args:
+        path (str): Directory where history data is stored. Created on the first record
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _location_dir(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    def _column_path(self, key: str, column: str) -> str:
+        return os.path.join(self._location_dir(key), f"{column}.bin")
+
+    def _aggregates_path(self, key: str, resolution: str) -> str:
+        return os.path.join(self._location_dir(key), f"{resolution}.agg")
+
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self._location_dir(key), ".lock")
+
+    def locations(self) -> List[str]:
+        """List the keys of all locations with recorded history"""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            name for name in os.listdir(self.path)
+            if os.path.isdir(self._location_dir(name))
+        )
+
+    def record(self, weather: Union[WeatherResponse, Forecast], timestamp: Optional[float] = None) -> str:
+        """
+        Append a current weather observation to the store
+
+        Args:
+            weather (WeatherResponse or Forecast): Response whose current conditions are recorded
+            timestamp (float, optional): Epoch seconds of the observation. Defaults to now
+
+        Returns:
+            str: Location key the observation was stored under
+
+        Raises:
+            OSError: If the store cannot be written
+        """
+        key = location_key(weather.location)
+        ts = time.time() if timestamp is None else float(timestamp)
+        values = [float(getattr(weather.current, field)) for field in FIELDS]
+
+        os.makedirs(self._location_dir(key), exist_ok=True)
+        with _locked(self._lock_path(key)):
+            self._repair_columns(key)
+            for column, value in zip(_COLUMNS, [ts] + values):
+                with open(self._column_path(key, column), "ab") as f:
+                    array(_TYPECODE, [value]).tofile(f)
+            for resolution, width in RESOLUTIONS.items():
+                self._update_aggregates(key, resolution, int(ts // width * width), values)
+        return key
+
+    def _repair_columns(self, key: str) -> None:
+        """Drop a torn trailing row left behind by an interrupted record"""
+        itemsize = array(_TYPECODE).itemsize
+        sizes = {}
+        for column in _COLUMNS:
+            path = self._column_path(key, column)
+            sizes[path] = os.path.getsize(path) if os.path.exists(path) else 0
+        rows = min(size // itemsize for size in sizes.values())
+        for path, size in sizes.items():
+            if size != rows * itemsize:
+                os.truncate(path, rows * itemsize)
+
+    def _update_aggregates(self, key: str, resolution: str, bucket: int,
+                           values: List[float]) -> None:
+        path = self._aggregates_path(key, resolution)
+        size = _AGGREGATE_ROW.size
+        with open(path, "ab"):
+            pass
+        with open(path, "r+b") as f:
+            end = f.seek(0, os.SEEK_END)
+            end -= end % size  # ignore a partially written trailing row
+            if end:
+                f.seek(end - size)
+                last = _AGGREGATE_ROW.unpack(f.read(size))
+                if last[0] == bucket:
+                    # Observations normally arrive in order, so only the
+                    # current bucket's row is rewritten in place
+                    f.seek(end - size)
+                    f.write(_AGGREGATE_ROW.pack(*_merge(last, bucket, values)))
+                    return
+            if not end or last[0] < bucket:
+                f.seek(end)
+                f.write(_AGGREGATE_ROW.pack(*_merge(None, bucket, values)))
+                f.truncate()
+                return
+
+            # Out-of-order observation for an older bucket
+            f.seek(0)
+            rows = [row for row in _AGGREGATE_ROW.iter_unpack(f.read(end))]
+            for i, row in enumerate(rows):
+                if row[0] == bucket:
+                    f.seek(i * size)
+                    f.write(_AGGREGATE_ROW.pack(*_merge(row, bucket, values)))
+                    return
+                if row[0] > bucket:
+                    rows.insert(i, _merge(None, bucket, values))
+                    f.seek(i * size)
+                    f.write(b"".join(_AGGREGATE_ROW.pack(*r) for r in rows[i:]))
+                    return
+
+    def observations(self, key: str, start: Optional[float] = None,
+                     end: Optional[float] = None) -> List[dict]:
+        """
+        Get raw observations for a location
+
+        Args:
+            key (str): Location key as returned by record() or locations()
+            start (float, optional): Only include observations at or after this epoch time
+            end (float, optional): Only include observations before this epoch time
+
+        Returns:
+            List[dict]: One dict per observation with a "timestamp" and every recorded field
+        """
+        if not os.path.exists(self._lock_path(key)):
+            return []
+        columns = {}
+        with _locked(self._lock_path(key), shared=True):
+            for column in _COLUMNS:
+                data = _read_mapped(self._column_path(key, column))
+                values = array(_TYPECODE)
+                values.frombytes(data[:len(data) - len(data) % values.itemsize])
+                columns[column] = values
+        # Guard against a partially written trailing row
+        length = min(len(values) for values in columns.values())
+        rows = []
+        for i in range(length):
+            ts = columns[TIMESTAMP_COLUMN][i]
+            if start is not None and ts < start:
+                continue
+            if end is not None and ts >= end:
+                continue
+            row = {"timestamp": ts}
+            for field in FIELDS:
+                row[field] = columns[field][i]
+            rows.append(row)
+        return rows
+
+    def trend(self, key: str, resolution: str = "hour", start: Optional[float] = None,
+              end: Optional[float] = None) -> List[dict]:
+        """
+        Get pre-computed aggregates for a location
+
+        Args:
+            key (str): Location key as returned by record() or locations()
+            resolution (str, optional): Either "hour" or "day". Defaults to "hour"
+            start (float, optional): Only include buckets starting at or after this epoch time
+            end (float, optional): Only include buckets starting before this epoch time
+
+        Returns:
+            List[dict]: One dict per bucket, sorted by time, with a "timestamp", a
+            "count" and "<field>_min", "<field>_max" and "<field>_mean" for every field
+
+        Raises:
+            ValueError: If the resolution is not supported
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Resolution must be one of: {', '.join(RESOLUTIONS)}")
+        if not os.path.exists(self._lock_path(key)):
+            return []
+
+        with _locked(self._lock_path(key), shared=True):
+            data = _read_mapped(self._aggregates_path(key, resolution))
+        data = data[:len(data) - len(data) % _AGGREGATE_ROW.size]
+
+        result = []
+        for bucket, count, *stats in _AGGREGATE_ROW.iter_unpack(data):
+            if start is not None and bucket < start:
+                continue
+            if end is not None and bucket >= end:
+                break
+            row = {"timestamp": bucket, "count": count}
+            for i, field in enumerate(FIELDS):
+                total, minimum, maximum = stats[3 * i:3 * i + 3]
+                row[f"{field}_min"] = minimum
+                row[f"{field}_max"] = maximum
+                row[f"{field}_mean"] = total / count
+            result.append(row)
+        return result
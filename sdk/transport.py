@@ -0,0 +1,209 @@
+import json
+import mmap
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import WeatherSDKException
+
+# Each recording line has the form "<key>\t<elapsed>\t<record json>\n".
+# json.dumps escapes tabs and newlines inside strings, so both separators are
+# unambiguous and the replay index can be built without decoding records.
+_SEPARATOR = b"\t"
+
+# Query parameters that must never end up in a recording
+_SECRET_PARAMS = ("key",)
+
+
+def request_key(url: str, params: Optional[dict]) -> str:
+    """Build a lookup key from the endpoint name and its non-secret params"""
+    endpoint = url.rstrip("/").rsplit("/", 1)[-1]
+    items = sorted(
+        (str(name), str(value)) for name, value in (params or {}).items()
+        if name not in _SECRET_PARAMS
+    )
+    return json.dumps([endpoint, items], ensure_ascii=False)
+
+
+class ReplayResponse:
+    """Minimal stand-in for requests.Response built from a recorded exchange"""
+
+    def __init__(self, url: str, status_code: int, headers: dict, text: str):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+
+class RecordingTransport:
+    """
+    Transport that forwards requests and records every exchange to a file.
+
+    Recordings are append-only, so several sessions can be captured into the
+    same file. API keys are stripped from the recorded query parameters.
+
+    Args:
+        path (str): File the exchanges are appended to
+        transport (optional): Transport used for the real requests. Defaults to the requests module
+    """
+
+    def __init__(self, path: str, transport=None):
+        self.path = path
+        self.transport = transport or requests
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None, **kwargs):
+        start = time.perf_counter()
+        response = self.transport.get(url, params=params, headers=headers, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        record = {
+            "url": url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": response.text,
+            "recorded_at": time.time(),
+        }
+        line = (
+            request_key(url, params).encode("utf-8") + _SEPARATOR
+            + repr(elapsed).encode("ascii") + _SEPARATOR
+            + json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        )
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(line)
+        return response
+
+
+class ReplayTransport:
+    """
+    Transport that serves responses from a file written by RecordingTransport.
+
+    The recording is memory-mapped and indexed by endpoint and parameters;
+    records are only decoded when served. Requests with several recorded
+    responses cycle through them in recording order.
+
+    Args:
+        path (str): Recording file to replay
+        speedup (float, optional): Factor injected latencies are divided by. Only valid
+            together with inject_latency, since responses are otherwise served immediately.
+            Defaults to 1.0
+        inject_latency (bool, optional): Whether to sleep for a latency sampled from the
+            recorded latency distribution before each response. Defaults to False
+        error_rates (Dict[int, float], optional): Probability of replacing a response with
+            an error of the given status code, e.g. {429: 0.1, 503: 0.05}
+        seed (int, optional): Seed for latency sampling and error injection
+
+    Raises:
+        ValueError: If speedup is not positive or is set without inject_latency, an error
+            status is not 4xx/5xx, or a rate is outside [0, 1] or the rates add up to more than 1
+    """
+
+    def __init__(self, path: str, speedup: float = 1.0, inject_latency: bool = False,
+                 error_rates: Optional[Dict[int, float]] = None, seed: Optional[int] = None):
+        if speedup <= 0:
+            raise ValueError("Speedup must be positive")
+        if speedup != 1.0 and not inject_latency:
+            raise ValueError("Speedup only applies when inject_latency is enabled")
+        self.error_rates = dict(error_rates or {})
+        for status_code, rate in self.error_rates.items():
+            if not 400 <= status_code <= 599:
+                raise ValueError(f"Injected status codes must be 4xx or 5xx, got {status_code}")
+            if not 0 <= rate <= 1:
+                raise ValueError(f"Error rate for {status_code} must be between 0 and 1")
+        if sum(self.error_rates.values()) > 1:
+            raise ValueError("Error rates must add up to at most 1")
+
+        self.path = path
+        self.speedup = speedup
+        self.inject_latency = inject_latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._positions: Dict[str, int] = {}
+        self._index: Dict[str, List[Tuple[int, int]]] = {}
+        self.latencies: List[float] = []
+
+        self._file = open(path, "rb")
+        if os.path.getsize(path) == 0:
+            self._mmap = None
+        else:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._build_index()
+
+    def _build_index(self) -> None:
+        mm = self._mmap
+        pos = 0
+        size = len(mm)
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            if end == -1:
+                # Ignore a partially written trailing line
+                break
+            key_end = mm.find(_SEPARATOR, pos, end)
+            elapsed_end = mm.find(_SEPARATOR, key_end + 1, end)
+            if key_end != -1 and elapsed_end != -1:
+                key = mm[pos:key_end].decode("utf-8")
+                self._index.setdefault(key, []).append((elapsed_end + 1, end))
+                self.latencies.append(float(mm[key_end + 1:elapsed_end]))
+            pos = end + 1
+
+    def __len__(self) -> int:
+        return len(self.latencies)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _injected_error(self) -> Optional[int]:
+        roll = self._random.random()
+        for status_code, rate in self.error_rates.items():
+            if roll < rate:
+                return status_code
+            roll -= rate
+        return None
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None, **kwargs):
+        key = request_key(url, params)
+        entries = self._index.get(key)
+        if not entries:
+            raise WeatherSDKException(f"No recorded response for {key}")
+
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            latency = self._random.choice(self.latencies) if self.inject_latency else 0.0
+            error = self._injected_error()
+
+        if latency:
+            time.sleep(latency / self.speedup)
+
+        if error is not None:
+            body = json.dumps({"error": {"message": f"Injected error {error}"}})
+            return ReplayResponse(url, error, {"Content-Type": "application/json"}, body)
+
+        start, end = entries[position % len(entries)]
+        record = json.loads(self._mmap[start:end].decode("utf-8"))
+        return ReplayResponse(url, record["status"], record["headers"], record["body"])
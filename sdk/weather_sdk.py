@@ -1,3 +1,4 @@
+import logging
 import requests
 import os
 from datetime import datetime, timedelta
@@ -6,6 +7,7 @@ from dateutil.parser import parse
 from dotenv import load_dotenv
 
 from .models import WeatherResponse, Forecast, Location, CurrentWeather, ForecastDay
+from .history import HistoryStore
 from .exceptions import (
     WeatherSDKException, 
     InvalidAPIKeyError, 
@@ -14,6 +16,8 @@ from .exceptions import (
     APIError
 )
 
+logger = logging.getLogger(__name__)
+
 class WeatherSDK:
     """
     A Python SDK for accessing weather data.
@@ -21,18 +25,27 @@ class WeatherSDK:
     Args:
         api_key (str, optional): API key for WeatherAPI.com. If not provided, will look for WEATHER_API_KEY env var
         use_dummy (bool, optional): Whether to use dummy data for testing. Defaults to False
+        history (HistoryStore, optional): Store that records every current weather observation.
+            Dummy data is never recorded, and failures to record are logged rather than raised
+        transport (optional): Object with a requests-style get() used for HTTP calls, such as
+            RecordingTransport or ReplayTransport. Defaults to the requests module
+        base_url (str, optional): Base URL of the API, e.g. a local WeatherGateway. Defaults to WeatherAPI.com
     
     Raises:
         InvalidAPIKeyError: If no API key is provided and WEATHER_API_KEY env var is not set
     """
     
-    def __init__(self, api_key: Optional[str] = None, use_dummy: bool = False):
+    def __init__(self, api_key: Optional[str] = None, use_dummy: bool = False,
+                 history: Optional[HistoryStore] = None, transport=None,
+                 base_url: str = "https://api.weatherapi.com/v1"):
         self.use_dummy = use_dummy
+        self.history = history
+        self.transport = transport
         load_dotenv()  # Always load env in case we switch modes
         self.api_key = api_key or os.getenv("WEATHER_API_KEY")
         if not self.use_dummy and not self.api_key:
             raise InvalidAPIKeyError("No API key provided")
-        self.base_url = "https://api.weatherapi.com/v1"
+        self.base_url = base_url.rstrip("/")
         
     def _make_request(self, endpoint: str, params: dict) -> dict:
         """Make a request to the WeatherAPI.com API"""
@@ -48,7 +61,8 @@ class WeatherSDK:
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers)
+            transport = self.transport or requests
+            response = transport.get(url, params=params, headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.HTTPError as e:
@@ -124,6 +138,15 @@ class WeatherSDK:
         
         return base_data
     
+    def _record_history(self, weather: Union[WeatherResponse, Forecast]) -> None:
+        """Record the current conditions of a live response, if history is enabled"""
+        if self.history is None or self.use_dummy:
+            return
+        try:
+            self.history.record(weather)
+        except OSError as e:
+            logger.warning("Failed to record weather history: %s", e)
+
     def get_current_weather(self, city: str) -> WeatherResponse:
         """
         Get current weather for a city
@@ -141,7 +164,9 @@ class WeatherSDK:
             APIError: If any other API error occurs
         """
         data = self._make_request("current.json", {"q": city})
-        return WeatherResponse(**data)
+        weather = WeatherResponse(**data)
+        self._record_history(weather)
+        return weather
     
     def get_forecast(self, city: str, days: int = 3) -> Forecast:
         """
@@ -161,4 +186,6 @@ class WeatherSDK:
             "q": city,
             "days": days
         })
-        return Forecast(**data)
+        forecast = Forecast(**data)
+        self._record_history(forecast)
+        return forecast
@@ -0,0 +1,23 @@
+import json
+import time
+
+from sdk.weather_sdk import WeatherSDK
+from sdk.transport import ReplayResponse
+
+class FakeUpstream:
+    """Serve dummy payloads like WeatherAPI.com, answering 404 for Atlantis"""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.dummy = WeatherSDK(use_dummy=True)
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.calls.append(dict(params))
+        if self.delay:
+            time.sleep(self.delay)
+        endpoint = url.rsplit("/", 1)[-1]
+        if params["q"] == "Atlantis":
+            body = json.dumps({"error": {"code": 1006, "message": "No matching location found."}})
+            return ReplayResponse(url, 404, {"Content-Type": "application/json"}, body)
+        body = json.dumps(self.dummy._get_dummy_data(endpoint, dict(params)))
+        return ReplayResponse(url, 200, {"Content-Type": "application/json"}, body)
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+import pytest
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from sdk.weather_sdk import WeatherSDK
+from sdk.gateway import WeatherGateway
+from sdk.exceptions import CityNotFoundError, InvalidAPIKeyError, APIError
+from tests.fakes import FakeUpstream
+
+@pytest.fixture
+def upstream():
+    return FakeUpstream(delay=0.2)
+
+@pytest.fixture
+def gateway(upstream):
+    """Run a gateway on a free port in a background event loop"""
+    gateway = WeatherGateway(api_key="gateway_key", transport=upstream, rate_limit=None)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(gateway.start(port=0), loop).result()
+    yield gateway
+    asyncio.run_coroutine_threadsafe(gateway.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+@pytest.fixture
+def sdk(gateway):
+    """Create a WeatherSDK instance pointed at the gateway"""
+    return WeatherSDK(api_key="client_key", base_url=f"http://127.0.0.1:{gateway.port}/v1")
+
+class TestWeatherGateway:
+    def test_requires_api_key(self, monkeypatch):
+        """Test gateway initialization without an API key"""
+        monkeypatch.setattr("sdk.gateway.load_dotenv", lambda: None)
+        monkeypatch.delenv("WEATHER_API_KEY", raising=False)
+        with pytest.raises(InvalidAPIKeyError):
+            WeatherGateway()
+
+    def test_serves_and_caches(self, sdk, gateway, upstream):
+        """Test that repeated requests are served from the cache"""
+        assert sdk.get_current_weather("London").location.name == "London"
+        assert sdk.get_current_weather("London").location.name == "London"
+        assert len(upstream.calls) == 1
+        assert upstream.calls[0]["key"] == "gateway_key"
+        assert gateway.stats["hits"] == 1
+
+    def test_coalesces_concurrent_misses(self, sdk, upstream):
+        """Test that concurrent misses share one upstream call"""
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(sdk.get_current_weather, ["Tokyo"] * 10))
+        assert all(r.location.name == "Tokyo" for r in results)
+        assert len(upstream.calls) == 1
+
+    def test_errors_pass_through_uncached(self, sdk, upstream):
+        """Test that upstream errors reach the client and are not cached"""
+        for _ in range(2):
+            with pytest.raises(CityNotFoundError):
+                sdk.get_current_weather("Atlantis")
+        assert len(upstream.calls) == 2
+
+    def test_rate_limit(self, upstream):
+        """Test that upstream calls are spaced out by the rate limiter"""
+        upstream.delay = 0
+        gateway = WeatherGateway(api_key="gateway_key", transport=upstream,
+                                 rate_limit=20, burst=1)
+
+        async def run():
+            await gateway.start(port=0)
+            start = time.monotonic()
+            await asyncio.gather(*(gateway.get("current.json", {"q": f"City {i}"})
+                                   for i in range(5)))
+            await gateway.close()
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.19
+        assert len(upstream.calls) == 5
+
+    def test_unknown_endpoint(self, gateway):
+        """Test requesting an endpoint the gateway does not mirror"""
+        async def fetch():
+            reader, writer = await asyncio.open_connection("127.0.0.1", gateway.port)
+            writer.write(b"GET /v1/astronomy.json?q=London HTTP/1.1\r\nConnection: close\r\n\r\n")
+            status = await reader.readline()
+            writer.close()
+            return status
+
+        assert asyncio.run(fetch()).startswith(b"HTTP/1.1 404")
+
+    def test_oversized_request_line(self, gateway):
+        """Test that requests beyond the reader limit get a 431 response"""
+        async def fetch():
+            reader, writer = await asyncio.open_connection("127.0.0.1", gateway.port)
+            query = "x" * 70000
+            writer.write(f"GET /v1/current.json?q={query} HTTP/1.1\r\n\r\n".encode("latin-1"))
+            status = await reader.readline()
+            rest = await reader.read()
+            writer.close()
+            return status, rest
+
+        status, rest = asyncio.run(fetch())
+        assert status.startswith(b"HTTP/1.1 431")
+        assert b"Connection: close" in rest
+
+    def test_upstream_timeout(self, upstream):
+        """Test that a hung upstream call answers 504 to every waiting client"""
+        upstream.delay = 0.5
+        gateway = WeatherGateway(api_key="gateway_key", transport=upstream,
+                                 rate_limit=None, timeout=0.1)
+
+        async def run():
+            await gateway.start(port=0)
+            results = await asyncio.gather(*(gateway.get("current.json", {"q": "London"})
+                                             for _ in range(3)))
+            # Let the abandoned upstream call finish before the loop closes
+            await asyncio.sleep(0.5)
+            await gateway.close()
+            return results
+
+        results = asyncio.run(run())
+        assert [response[0] for response, _ in results] == [504] * 3
+        assert len(upstream.calls) == 1
+
+    def test_timeout_maps_to_api_error(self, upstream):
+        """Test that upstream timeouts reach SDK clients as a 504 APIError"""
+        gateway = WeatherGateway(api_key="gateway_key", transport=upstream,
+                                 rate_limit=None, timeout=0.1)
+        upstream.delay = 0.5
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        asyncio.run_coroutine_threadsafe(gateway.start(port=0), loop).result()
+        try:
+            sdk = WeatherSDK(api_key="client_key", base_url=f"http://127.0.0.1:{gateway.port}/v1")
+            with pytest.raises(APIError) as excinfo:
+                sdk.get_current_weather("London")
+            assert excinfo.value.status_code == 504
+            time.sleep(0.5)
+        finally:
+            asyncio.run_coroutine_threadsafe(gateway.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+    def test_default_session_pool_matches_workers(self):
+        """Test that the default session can keep a connection per worker"""
+        gateway = WeatherGateway(api_key="gateway_key", max_workers=48)
+        adapter = gateway.transport.get_adapter("https://api.weatherapi.com/v1")
+        assert adapter._pool_maxsize == 48
@@ -0,0 +1,156 @@
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from sdk.weather_sdk import WeatherSDK
+from sdk.history import HistoryStore
+from sdk.models import Forecast, WeatherResponse
+from tests.fakes import FakeUpstream
+
+BASE = 86400 * 1000
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a HistoryStore in a temporary directory"""
+    return HistoryStore(str(tmp_path / "history"))
+
+@pytest.fixture
+def sdk(store):
+    """Create a WeatherSDK instance against a fake upstream that records history"""
+    return WeatherSDK(api_key="test_key", transport=FakeUpstream(), history=store)
+
+def observation(temp_c):
+    """Build a London observation with the given temperature"""
+    data = WeatherSDK(use_dummy=True)._get_dummy_data("current.json", {"q": "London"})
+    data["current"]["temp_c"] = temp_c
+    return WeatherResponse(**data)
+
+class TestHistoryStore:
+    def test_sdk_records_current_weather(self, sdk, store):
+        """Test that current weather lookups are recorded"""
+        sdk.get_current_weather("London")
+        sdk.get_current_weather("London")
+        sdk.get_current_weather("Tokyo")
+        assert len(store.locations()) == 2
+        key = [k for k in store.locations() if k.startswith("london")][0]
+        rows = store.observations(key)
+        assert len(rows) == 2
+        assert rows[0]["temp_c"] == 22.0
+        assert rows[0]["humidity"] == 65.0
+
+    def test_dummy_data_not_recorded(self, store):
+        """Test that dummy responses never reach the store"""
+        WeatherSDK(use_dummy=True, history=store).get_current_weather("London")
+        assert store.locations() == []
+
+    def test_record_failure_does_not_fail_lookup(self, sdk, store, mocker):
+        """Test that a failing store only logs a warning"""
+        mocker.patch.object(store, "record", side_effect=OSError("disk full"))
+        assert sdk.get_current_weather("London").location.name == "London"
+
+    def test_hourly_and_daily_aggregates(self, store):
+        """Test incremental min/max/mean aggregates"""
+        for offset, temp in [(0, 10.0), (600, 20.0), (3600, 30.0)]:
+            key = store.record(observation(temp), timestamp=BASE + offset)
+
+        hourly = store.trend(key, "hour")
+        assert [row["timestamp"] for row in hourly] == [BASE, BASE + 3600]
+        assert hourly[0]["count"] == 2
+        assert hourly[0]["temp_c_min"] == 10.0
+        assert hourly[0]["temp_c_max"] == 20.0
+        assert hourly[0]["temp_c_mean"] == 15.0
+
+        daily = store.trend(key, "day")
+        assert len(daily) == 1
+        assert daily[0]["count"] == 3
+        assert daily[0]["temp_c_mean"] == 20.0
+
+        assert len(store.trend(key, "hour", start=BASE + 3600)) == 1
+        assert len(store.observations(key, end=BASE + 3600)) == 2
+
+    def test_out_of_order_observations(self, store):
+        """Test observations arriving for older buckets"""
+        key = store.record(observation(30.0), timestamp=BASE + 7200)
+        store.record(observation(10.0), timestamp=BASE)
+        store.record(observation(20.0), timestamp=BASE + 7300)
+        store.record(observation(12.0), timestamp=BASE + 100)
+        hourly = store.trend(key, "hour")
+        assert [row["timestamp"] for row in hourly] == [BASE, BASE + 7200]
+        assert [row["count"] for row in hourly] == [2, 2]
+        assert hourly[0]["temp_c_mean"] == 11.0
+
+    def test_current_bucket_updated_in_place(self, store):
+        """Test that appends within a bucket do not grow the aggregates"""
+        for i in range(50):
+            key = store.record(observation(20.0), timestamp=BASE + i)
+        size = os.path.getsize(store._aggregates_path(key, "hour"))
+        store.record(observation(20.0), timestamp=BASE + 60)
+        assert os.path.getsize(store._aggregates_path(key, "hour")) == size
+
+    def test_observations_match_aggregates(self, store):
+        """Test that raw and aggregated values agree exactly"""
+        key = store.record(observation(21.3), timestamp=BASE)
+        assert store.observations(key)[0]["temp_c"] == 21.3
+        assert store.trend(key, "hour")[0]["temp_c_mean"] == 21.3
+
+    def test_shared_between_instances(self, store):
+        """Test that several store instances on one directory stay consistent"""
+        other = HistoryStore(store.path)
+        key = store.record(observation(20.0), timestamp=BASE)
+        assert other.trend(key, "day")[0]["count"] == 1
+        other.record(observation(20.0), timestamp=BASE + 1)
+        store.record(observation(20.0), timestamp=BASE + 2)
+        other.record(observation(20.0), timestamp=BASE + 3)
+        for reader in (store, other, HistoryStore(store.path)):
+            assert len(reader.observations(key)) == 4
+            assert reader.trend(key, "day")[0]["count"] == 4
+
+    def test_torn_write_repaired(self, store):
+        """Test that a row interrupted mid-write does not shift later rows"""
+        key = store.record(observation(20.0), timestamp=BASE)
+        with open(store._column_path(key, "humidity"), "ab") as f:
+            f.write(b"\x00" * 4)
+        store.record(observation(21.0), timestamp=BASE + 1)
+        store.record(observation(22.0), timestamp=BASE + 2)
+        rows = store.observations(key)
+        assert [row["temp_c"] for row in rows] == [20.0, 21.0, 22.0]
+        assert [row["humidity"] for row in rows] == [65.0] * 3
+        assert store.trend(key, "hour")[0]["count"] == 3
+
+    def test_reader_does_not_create_files(self, tmp_path):
+        """Test that reading a missing store has no side effects"""
+        path = tmp_path / "missing"
+        reader = HistoryStore(str(path))
+        assert reader.locations() == []
+        assert reader.trend("london", "hour") == []
+        assert reader.observations("london") == []
+        assert not path.exists()
+
+    def test_reader_without_write_access(self, store, tmp_path):
+        """Test reading a store whose files are read-only"""
+        key = store.record(observation(20.0), timestamp=BASE)
+        for name in os.listdir(store._location_dir(key)):
+            os.chmod(os.path.join(store._location_dir(key), name), 0o444)
+        reader = HistoryStore(store.path)
+        assert reader.trend(key, "hour")[0]["count"] == 1
+        assert len(reader.observations(key)) == 1
+
+    def test_forecast_current_recorded(self, sdk, store):
+        """Test that the current conditions of a forecast are recorded"""
+        weather = observation(18.0)
+        forecast = Forecast(location=weather.location, current=weather.current, forecast=[])
+        sdk._record_history(forecast)
+        key = store.locations()[0]
+        assert store.observations(key)[0]["temp_c"] == 18.0
+
+    def test_invalid_resolution(self, store):
+        """Test trend with an unsupported resolution"""
+        key = store.record(observation(20.0))
+        with pytest.raises(ValueError):
+            store.trend(key, "week")
@@ -0,0 +1,98 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from sdk.weather_sdk import WeatherSDK
+from sdk.transport import RecordingTransport, ReplayTransport, ReplayResponse
+from sdk.exceptions import (
+    WeatherSDKException,
+    CityNotFoundError,
+    RateLimitError,
+    APIError
+)
+from tests.fakes import FakeUpstream
+
+@pytest.fixture
+def recording(tmp_path):
+    """Record a small session against the fake transport"""
+    path = str(tmp_path / "session.rec")
+    sdk = WeatherSDK(api_key="secret_key", transport=RecordingTransport(path, FakeUpstream()))
+    sdk.get_current_weather("London")
+    sdk.get_current_weather("Tokyo")
+    with pytest.raises(CityNotFoundError):
+        sdk.get_current_weather("Atlantis")
+    return path
+
+class TestTransport:
+    def test_recording_strips_api_key(self, recording):
+        """Test that API keys never reach the recording"""
+        with open(recording, encoding="utf-8") as f:
+            content = f.read()
+        assert "secret_key" not in content
+        assert len(content.splitlines()) == 3
+
+    def test_replay_serves_recorded_responses(self, recording):
+        """Test replaying recorded successes and errors"""
+        with ReplayTransport(recording) as transport:
+            assert len(transport) == 3
+            sdk = WeatherSDK(api_key="other_key", transport=transport)
+            assert sdk.get_current_weather("Tokyo").location.name == "Tokyo"
+            assert sdk.get_current_weather("London").current.temp_c == 22.0
+            with pytest.raises(CityNotFoundError):
+                sdk.get_current_weather("Atlantis")
+
+    def test_replay_missing_request(self, recording):
+        """Test replaying a request that was never recorded"""
+        with ReplayTransport(recording) as transport:
+            sdk = WeatherSDK(api_key="other_key", transport=transport)
+            with pytest.raises(WeatherSDKException):
+                sdk.get_current_weather("Paris")
+
+    def test_replay_error_injection(self, recording):
+        """Test injecting errors into replayed responses"""
+        with ReplayTransport(recording, error_rates={429: 1.0}) as transport:
+            sdk = WeatherSDK(api_key="other_key", transport=transport)
+            with pytest.raises(RateLimitError):
+                sdk.get_current_weather("London")
+
+        with ReplayTransport(recording, error_rates={503: 0.5}, seed=1) as transport:
+            sdk = WeatherSDK(api_key="other_key", transport=transport)
+            errors = 0
+            for _ in range(200):
+                try:
+                    sdk.get_current_weather("London")
+                except APIError as e:
+                    assert e.status_code == 503
+                    errors += 1
+            assert 50 < errors < 150
+
+    def test_replay_latency_speedup(self, recording, mocker):
+        """Test that injected latency is scaled by the speedup factor"""
+        sleep = mocker.patch("sdk.transport.time.sleep")
+        with ReplayTransport(recording, speedup=10, inject_latency=True, seed=0) as transport:
+            transport.latencies = [2.0]
+            WeatherSDK(api_key="other_key", transport=transport).get_current_weather("London")
+        sleep.assert_called_once_with(0.2)
+
+    def test_replay_invalid_options(self, recording):
+        """Test replay with invalid options"""
+        with pytest.raises(ValueError):
+            ReplayTransport(recording, speedup=0)
+        with pytest.raises(ValueError):
+            ReplayTransport(recording, speedup=10)
+        with pytest.raises(ValueError):
+            ReplayTransport(recording, error_rates={429: 0.7, 500: 0.7})
+        with pytest.raises(ValueError):
+            ReplayTransport(recording, error_rates={429: -0.5, 500: 1.2})
+        with pytest.raises(ValueError):
+            ReplayTransport(recording, error_rates={200: 0.5})
+
+    def test_replay_headers_case_insensitive(self):
+        """Test that replayed headers behave like requests headers"""
+        response = ReplayResponse("current.json", 200, {"content-type": "text/plain"}, "")
+        assert response.headers["Content-Type"] == "text/plain"
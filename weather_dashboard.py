@@ -2,12 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from sdk.weather_sdk import WeatherSDK
+from sdk.history import HistoryStore
 from datetime import datetime
+import os
 
 class WeatherDashboard:
     def __init__(self):
         try:
             self.sdk = WeatherSDK(use_dummy=True)  # Use dummy data for testing
+            # Read-only view of history recorded by SDK clients using the live API
+            self.history = HistoryStore(os.getenv("WEATHER_HISTORY_DIR", ".weather_history"))
             st.set_page_config(
                 page_title="Weather Dashboard 2025",
                 page_icon="🌤️",
@@ -28,6 +32,13 @@ class WeatherDashboard:
             })
         return pd.DataFrame(data)
 
+    def create_history_df(self, key, resolution="hour"):
+        """Convert recorded history aggregates to DataFrame"""
+        df = pd.DataFrame(self.history.trend(key, resolution))
+        if not df.empty:
+            df['time'] = pd.to_datetime(df['timestamp'], unit='s')
+        return df
+
     def run(self):
         # Page config
         st.set_page_config(
@@ -80,6 +91,23 @@ class WeatherDashboard:
                          title='Temperature Trend')
             st.plotly_chart(fig, use_container_width=True)
 
+            # Observed history, as recorded by live SDK clients
+            locations = self.history.locations()
+            if locations:
+                # Keys start with the city name followed by region and country
+                prefix = city.lower().replace(" ", "_") + "_"
+                matches = [i for i, key in enumerate(locations) if key.startswith(prefix)]
+                key = st.selectbox("History Location", locations,
+                                   index=matches[0] if matches else 0)
+                resolution = st.radio("History Resolution", ["hour", "day"], horizontal=True)
+                history_df = self.create_history_df(key, resolution)
+                if not history_df.empty:
+                    fig = px.line(history_df, x='time',
+                                  y=['temp_c_min', 'temp_c_mean', 'temp_c_max'],
+                                  labels={'value': 'Temperature (°C)', 'time': 'Time'},
+                                  title='Observed Temperature History')
+                    st.plotly_chart(fig, use_container_width=True)
+
             # Daily forecast cards
             st.markdown("### Daily Details")
             for i in range(0, len(df), 3):
@@ -0,0 +1,4 @@
+from sdk.gateway import main
+
+if __name__ == "__main__":
+    main()